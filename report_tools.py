@@ -1,7 +1,12 @@
 import os
+import functools
+import importlib.util
+from types import MappingProxyType
+import numpy as np
 import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 # Default ref locations (override when calling functions)
@@ -19,31 +24,158 @@ DEFAULT_INPUT_FILES = {
     "sales_order": "DMS-Sales Order-on.xlsx",
 }
 
+def _has_module(name):
+    return importlib.util.find_spec(name) is not None
+
+# Rust-backed calamine reader (pandas >= 2.2) when installed, else openpyxl
+_PANDAS_VERSION = tuple(int(p) for p in pd.__version__.split('.')[:2])
+_EXCEL_ENGINE = 'calamine' if _has_module('python_calamine') and _PANDAS_VERSION >= (2, 2) else 'openpyxl'
+
+def _copy_on_write(func):
+    """Run func under pandas copy-on-write (the default from pandas 3) without
+    turning the option on for the caller; column projections and fills inside
+    then share buffers until written instead of copying up front.
+    """
+    if _PANDAS_VERSION[0] != 2:
+        return func
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with pd.option_context('mode.copy_on_write', True):
+            return func(*args, **kwargs)
+    return wrapper
+
 ACCOUNTING_FMT = '_(* #,##0.00_);_(* (#,##0.00);_(* "-"_);_(@_)'
+DATETIME_FMT = 'YYYY-MM-DD HH:MM:SS'
 ALLOWED_PRODUCT_COLS = ['Product Code', 'product_code', 'SKU CODE']
 
+# report styles, built once and shared by every format_and_save_excel call
+_HEADER_FILL = PatternFill(start_color='000000', end_color='000000', fill_type='solid')
+_HEADER_FONT = Font(bold=True, color='FFFFFF')
+_HEADER_ALIGN = Alignment(horizontal='center')
+_HEADER_BORDER = Border(top=Side(style='thin'), right=Side(style='thin'), bottom=Side(style='thin'), left=Side(style='thin'))
+_SUM_FONT = Font(bold=True, color='FF0000')
+_ACCOUNTING_NS = NamedStyle(name='accounting_style', number_format=ACCOUNTING_FMT)
+
+# report schemas: input projections, rename maps, final column orders and the
+# pre-rename columns picked for each report
+_INV_SRC_COLS = ('Invoice Item Type','Invoice Date','Sold To Customer Number','Sold To Customer Name','Product Code','Product/Item Description','Total Item amount with Tax and Discount')
+_INV_COLS = ('DATE','ACCOUNT CODE','ACCOUNT NAME','SKU CODE','SKU NAME','SERVED INVOICE')
+_RET_SRC_COLS = ('Customer Return Date','Sold To Customer Number','Sold To Customer Name','Product Code','Product Description','Facility Name','Estimated Product Return Amount')
+_RET_RENAME = MappingProxyType({
+    'Customer Return Date':'DATE','Sold To Customer Number':'ACCOUNT CODE','Sold To Customer Name':'ACCOUNT NAME',
+    'Product Code':'SKU CODE','Product Description':'SKU NAME','BO':'BAD RETURNS','FG':'GOOD RETURNS'
+})
+_CUSTOMER_COLS = ('NEXT_UP_NUMBER','PARTY_CLASSIFICATION_DESCRIPTION','KEY_ACCOUNT','SALES_REP_ID','SALES_REP_NAME','BRANCH_NAME','GEO_LOCATION_HIERARCHYDESCRIPTION','CITY','STATE_PROVINCE','CHANNEL')
+_SO_SRC_COLS = ('Last Modified Date','Sold To Customer number','Sold To Customer Name','Product Code','Product Description','Total Product Amount','SO status')
+
+_NET_RENAME = MappingProxyType({
+    'DATE':'Date','WEEK':'Week','BRANCH_NAME':'Branch Name','SALES_REP_ID':'Employee Code','SALES_REP_NAME':'Employee Name',
+    'KEY_ACCOUNT':'Channel','ACCOUNT CODE':'Sold To Customer number','ACCOUNT NAME':'Sold To Customer Name','CATEGORY':'Category',
+    'SKU CODE':'Product Code','SKU NAME':'Product Description','VOLUME':'Volume','VALUE':'Net Value','GOOD RETURNS':'Good Stock Returns',
+    'BAD RETURNS':'Bad Stock Returns','PARTY_CLASSIFICATION_DESCRIPTION':'Channel_Classification','GEO_LOCATION_HIERARCHYDESCRIPTION':'Brgy',
+    'CITY':'Town','STATE_PROVINCE':'Province','FS':'FS','CHANNEL':'RTM Model'
+})
+_NET_COLS = ('RD Name','Date','Week','Branch Name','Employee Code','Employee Name','Channel','Sold To Customer number','Sold To Customer Name','Category',
+             'Product Code','Product Description','Volume','Net Value','Good Stock Returns','Bad Stock Returns','Channel_Classification','Brgy','Town','Province','FS','RTM Model')
+
+_SERVED_RENAME = MappingProxyType({
+    'DATE':'Invoice Date','WEEK':'Week','BRANCH_NAME':'Branch Name','SALES_REP_ID':'Employee Code','SALES_REP_NAME':'Employee Name',
+    'KEY_ACCOUNT':'Channel','ACCOUNT CODE':'Sold To Customer Number','ACCOUNT NAME':'Sold To Customer Name','CATEGORY':'Category',
+    'SKU CODE':'Product Code','SKU NAME':'Product Description','VOLUME':'Volume','SERVED INVOICE':'Value','PARTY_CLASSIFICATION_DESCRIPTION':'Channel Type'
+})
+_SERVED_COLS = ('RD Name','Invoice Date','Week','Branch Name','Employee Code','Employee Name','Channel','Sold To Customer Number','Sold To Customer Name','Category',
+                'Product Code','Product Description','Volume','Value','FS','Channel Type')
+
+_SO_RENAME = MappingProxyType({
+    'Last Modified Date': 'SO Date',
+    'WEEK': 'Week',
+    'BRANCH_NAME': 'Branch Name',
+    'SALES_REP_ID': 'Employee Code',
+    'SALES_REP_NAME': 'Employee Name',
+    'KEY_ACCOUNT': 'Channel',
+    'Sold To Customer number': 'Sold To Customer Number',
+    'CATEGORY': 'Category',
+    'VOLUME': 'Volume',
+    'with vat': 'Value',
+    'PARTY_CLASSIFICATION_DESCRIPTION': 'Channel Type'
+})
+_SO_COLS = (
+    'RD Name', 'SO Date', 'Week', 'Branch Name', 'Employee Code',
+    'Employee Name', 'Channel', 'Sold To Customer Number',
+    'Sold To Customer Name', 'Category', 'Product Code',
+    'Product Description', 'Volume', 'Value', 'FS', 'Channel Type'
+)
+
+def _source_cols(rename_map, cols):
+    """The pre-rename column name behind each report column."""
+    source = {v: k for k, v in rename_map.items()}
+    return tuple(source.get(c, c) for c in cols)
+
+_NET_PICK = _source_cols(_NET_RENAME, _NET_COLS)
+_SERVED_PICK = _source_cols(_SERVED_RENAME, _SERVED_COLS)
+_SO_PICK = _source_cols(_SO_RENAME, _SO_COLS)
+
+def _read_excel(path):
+    """Parse an xlsx with calamine when available, else openpyxl."""
+    return pd.read_excel(path, engine=_EXCEL_ENGINE)
+
+def _read_cached(path):
+    """Read an xlsx through a parquet copy kept next to it (``<path>.parquet``).
+    The copy records the xlsx's mtime and size and is reused only while both
+    match exactly; otherwise the xlsx is parsed and the copy rewritten. The
+    copy is skipped when pyarrow is missing, the headers are not all strings
+    (parquet would stringify them) or the frame cannot be stored as parquet.
+    """
+    cache = path + '.parquet'
+    st = os.stat(path)
+    stamp = [st.st_mtime_ns, st.st_size]
+    try:
+        cached = pd.read_parquet(cache)
+        if cached.attrs.pop('source_stamp', None) == stamp:
+            return cached
+    except (OSError, ImportError, ValueError):
+        pass
+    df = _read_excel(path)
+    if all(isinstance(c, str) for c in df.columns):
+        try:
+            out = df.copy(deep=False)
+            out.attrs['source_stamp'] = stamp
+            out.to_parquet(cache, compression='zstd')
+        except (OSError, ImportError, ValueError, TypeError):
+            pass
+    return df
+
+@functools.lru_cache(maxsize=16)
+def _read_ref(path, mtime):
+    return _read_cached(path)
+
 def read_refs(ref_paths=None):
     ref_paths = ref_paths or DEFAULT_REFS
-    return {k: pd.read_excel(v) for k, v in ref_paths.items()}
+    # refs rarely change: memoize per (path, mtime) for the session
+    return {k: _read_ref(v, os.path.getmtime(v)).copy() for k, v in ref_paths.items()}
 
 def read_inputs(import_path, input_files=None):
     files = input_files or DEFAULT_INPUT_FILES
-    return {k: pd.read_excel(os.path.join(import_path, fname)) for k, fname in files.items()}
+    return {k: _read_cached(os.path.join(import_path, fname)) for k, fname in files.items()}
 
+@_copy_on_write
 def build_m0_pricelist(pl_df):
-    df = pl_df[['product_code', 'product_description', 'uom_description', 'selling_price', 'cust_class', 'cust_channel']].copy()
+    df = pl_df[['product_code', 'product_description', 'uom_description', 'selling_price', 'cust_class', 'cust_channel']]
     df['with_vat'] = df['selling_price'] * 1.12
     df = df[(df['cust_class'] != 'BEV Dealer') & (df['cust_channel'] != 'VAN(EXTRUCK)')]
-    pivot = df.pivot_table(index=['product_code', 'product_description'], columns='uom_description', values='with_vat', aggfunc='sum').reset_index()
+    # single-aggregation pivot: groupby().sum().unstack() skips pivot_table's margin/aggfunc machinery
+    pivot = (df.groupby(['product_code', 'product_description', 'uom_description'])['with_vat'].sum()
+               .unstack('uom_description').reset_index())
     for col in ('Case','Subcase','Piece'):
         if col not in pivot.columns:
             pivot[col] = 0
-    pl_m0 = pivot[['product_code','product_description','Case','Subcase','Piece']].copy()
+    pl_m0 = pivot[['product_code','product_description','Case','Subcase','Piece']]
 
     # canonical price_ref contains both SKU CODE and Product Code names to avoid merge KeyErrors
-    price_ref = pl_m0[['product_code','Case']].rename(columns={'product_code':'SKU CODE','Case':'SKU PRICE REFERENCE'}).copy()
+    price_ref = pl_m0[['product_code','Case']].rename(columns={'product_code':'SKU CODE','Case':'SKU PRICE REFERENCE'})
     price_ref['Product Code'] = price_ref['SKU CODE']
-    return pl_m0, price_ref
+    # copied so its columns share no buffers with pl_m0 or each other once out of copy-on-write
+    return pl_m0, price_ref.copy()
 
 def _ensure_price_ref(price_ref):
     """Return DataFrame with columns ['Product Code','SKU PRICE REFERENCE'].
@@ -95,26 +227,16 @@ def _ensure_price_ref(price_ref):
 def format_and_save_excel(df, out_path, numeric_cols=None, autofit_cols=None, header_row=2):
     numeric_cols = numeric_cols or []
     autofit_cols = autofit_cols or []
-    tmp = os.path.join(os.path.dirname(out_path) or '.', "_tmp_report_tools.xlsx")
-    with pd.ExcelWriter(tmp, engine='openpyxl') as w:
-        df.to_excel(w, index=False, startrow=header_row-1)
-    wb = load_workbook(tmp)
-    ws = wb.active
-    # header style
-    hf = PatternFill(start_color='000000', end_color='000000', fill_type='solid')
-    hf_font = Font(bold=True, color='FFFFFF')
-    for cell in ws[header_row]:
-        cell.fill = hf
-        cell.font = hf_font
-        cell.alignment = Alignment(horizontal='center')
+    # stream straight into a write-only workbook (lxml-backed when installed)
+    # instead of writing a temp file with pandas and re-styling it
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title='Sheet1')
     # robust named styles check
     existing_names = set(getattr(s, 'name', s) for s in wb.named_styles)
-    if "accounting_style" not in existing_names:
-        ns = NamedStyle(name="accounting_style", number_format=ACCOUNTING_FMT)
-        wb.add_named_style(ns)
+    if _ACCOUNTING_NS.name not in existing_names:
+        wb.add_named_style(_ACCOUNTING_NS)
     data_start = header_row + 1
-    data_end = ws.max_row
-    sum_row = data_end + 1
+    data_end = header_row + len(df)
 
     def col_to_index(col):
         if isinstance(col, int):
@@ -124,141 +246,197 @@ def format_and_save_excel(df, out_path, numeric_cols=None, autofit_cols=None, he
         except ValueError:
             return None
 
-    for col in numeric_cols:
-        idx = col_to_index(col)
-        if not idx:
-            continue
-        for r in range(data_start, data_end + 1):
-            cell = ws.cell(row=r, column=idx)
-            if isinstance(cell.value, (int, float)):
-                cell.number_format = ACCOUNTING_FMT
-        col_letter = get_column_letter(idx)
-        s = ws.cell(row=sum_row, column=idx)
-        s.value = f"=SUM({col_letter}{data_start}:{col_letter}{data_end})"
-        s.font = Font(bold=True, color="FF0000")
-        s.number_format = ACCOUNTING_FMT
+    numeric_idxs = sorted(set(filter(None, (col_to_index(c) for c in numeric_cols))))
+    pos = set(i - 1 for i in numeric_idxs)
+    sums = {i: f"=SUM({get_column_letter(i)}{data_start}:{get_column_letter(i)}{data_end})" for i in numeric_idxs}
+    # NaN/NaT are written as blank cells, same as DataFrame.to_excel
+    values = df.astype(object).where(df.notna(), None)
 
+    # column widths have to be set before the first row is streamed;
+    # measure them on the DataFrame columns rather than cell by cell
     for col in autofit_cols:
         idx = col_to_index(col) or (col if isinstance(col,int) else None)
         if not idx:
             continue
         letter = get_column_letter(idx) if isinstance(idx,int) else idx
         maxlen = 0
-        for c in ws[letter]:
-            if c.value:
-                maxlen = max(maxlen, len(str(c.value)))
+        if idx <= len(df.columns):
+            col_values = df.iloc[:, idx - 1].dropna()
+            if pd.api.types.is_datetime64_any_dtype(col_values.dtype):
+                # datetimes are written with DATETIME_FMT, not their str() form
+                widest = len(DATETIME_FMT) if len(col_values) else 0
+            elif idx - 1 in pos:
+                # numbers and the SUM total are shown in ACCOUNTING_FMT: size by the
+                # widest of them formatted as 1,234.00 plus the format's padding
+                nums = pd.to_numeric(col_values, errors='coerce')
+                texts = col_values[nums.isna()].astype(str).str.len()
+                nums = nums.dropna()
+                widest = int(texts.max()) if len(texts) else 0
+                if len(nums):
+                    largest = max(nums.abs().max(), abs(nums.sum()))
+                    widest = max(widest, len(f"{largest:,.2f}") + 2)
+            else:
+                s = col_values.astype(str).str.len()
+                widest = int(s.max()) if len(s) else 0
+            maxlen = max(len(str(df.columns[idx - 1])), widest)
         ws.column_dimensions[letter].width = maxlen + 2
-
     ws.sheet_view.showGridLines = False
+
+    # header style
+    for _ in range(header_row - 1):
+        ws.append([])
+    header = []
+    for name in df.columns:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.fill = _HEADER_FILL
+        cell.font = _HEADER_FONT
+        cell.alignment = _HEADER_ALIGN
+        cell.border = _HEADER_BORDER
+        header.append(cell)
+    ws.append(header)
+
+    # resolve per-column formats once from the dtypes: numeric columns need no
+    # per-value type check, object columns only format the real numbers;
+    # pandas writes datetimes with its own default format
+    dtypes = list(df.dtypes)
+    styled = [(i, ACCOUNTING_FMT, not pd.api.types.is_numeric_dtype(dtypes[i])) for i in sorted(pos) if i < len(dtypes)]
+    styled += [(i, DATETIME_FMT, False) for i, dt in enumerate(dtypes) if pd.api.types.is_datetime64_any_dtype(dt)]
+    for row in values.itertuples(index=False, name=None):
+        out = list(row)
+        for i, fmt, check in styled:
+            v = out[i]
+            if v is None or (check and not isinstance(v, (int, float))):
+                continue
+            cell = WriteOnlyCell(ws, value=v)
+            cell.number_format = fmt
+            out[i] = cell
+        ws.append(out)
+
+    if numeric_idxs:
+        total = [None] * max(numeric_idxs)
+        for idx in numeric_idxs:
+            s = WriteOnlyCell(ws, value=sums[idx])
+            s.font = _SUM_FONT
+            s.number_format = ACCOUNTING_FMT
+            total[idx - 1] = s
+        ws.append(total)
+
     wb.save(out_path)
     wb.close()
-    try:
-        os.remove(tmp)
-    except OSError:
-        pass
 
-def _build_price_map(price_ref):
-    """Map string(product_code) -> numeric price using only allowed product headers."""
+def build_price_map(price_ref):
+    """Map string(product_code) -> numeric price using only allowed product headers.
+    Build it once per run and pass it to the assemblers as price_map.
+    """
     pr = _ensure_price_ref(price_ref)
-    # keep keys as strings for reliable mapping
-    keys = pr['Product Code'].astype(str)
-    vals = pd.to_numeric(pr['SKU PRICE REFERENCE'], errors='coerce').fillna(0)
-    return dict(zip(keys, vals))
-
-def assemble_net_invoiced(inp, refs, price_ref):
-    inv = inp['invoice'].copy()
-    inv = inv[inv['Invoice Item Type'] != 'ITM_SALES_TAX'][[
-        'Invoice Date','Sold To Customer Number','Sold To Customer Name','Product Code','Product/Item Description','Total Item amount with Tax and Discount'
-    ]]
-    inv.columns = ['DATE','ACCOUNT CODE','ACCOUNT NAME','SKU CODE','SKU NAME','SERVED INVOICE']
-    inv['SERVED INVOICE'] = inv['SERVED INVOICE'].fillna(0)
+    # keep keys as strings for reliable mapping; prices are already numeric
+    keys = pr['Product Code'].astype(str).to_numpy()
+    vals = pr['SKU PRICE REFERENCE'].to_numpy(dtype=np.float64)
+    return dict(zip(keys.tolist(), vals.tolist()))
+
+def _invoice_lines(invoice):
+    """The invoice columns we use, without ITM_SALES_TAX lines, in one take."""
+    mask = invoice['Invoice Item Type'].to_numpy() != 'ITM_SALES_TAX'
+    return invoice.loc[mask, list(_INV_SRC_COLS[1:])]
+
+def _join_refs(df, cust_df, refs, account='ACCOUNT CODE', sku='SKU CODE', date='DATE'):
+    """Attach customer master, category, field supervisors and week to df.
+    cust_df is keyed by the account column; the refs are renamed onto df's
+    sku and date column names. Rows without a matching week are dropped.
+    """
+    cat = refs['category'].drop(columns=['SKU NAME'], errors='ignore').rename(columns={'SKU CODE': sku})
+    wk = refs['week'].rename(columns={'DATE': date})
+    return (df.merge(cust_df, on=account, how='left')
+              .merge(cat, on=sku, how='left')
+              .merge(refs['field_supervisors'], on='SALES_REP_ID', how='left')
+              .merge(wk, on=date, how='inner'))
+
+def _attach_price(df, price_map):
+    """Set 'SKU PRICE REFERENCE' on df by string SKU CODE (0 when unpriced)."""
+    df['SKU PRICE REFERENCE'] = df['SKU CODE'].astype(str).map(price_map).fillna(0)
+    return df
+
+def _volume(value, price):
+    """value / price in one pass over the arrays; 0 where the price is 0 or missing."""
+    value = np.asarray(value, dtype=np.float64)
+    price = np.nan_to_num(np.asarray(price, dtype=np.float64))
+    volume = np.zeros_like(value)
+    np.divide(value, price, out=volume, where=price != 0)
+    return volume
+
+def _finalize(df, source_cols, cols, sort_by):
+    """Select the source columns behind the report cols, label them and sort.
+    Only the kept columns are renamed, via plain list assignment.
+    """
+    out = df[list(source_cols)]
+    out.columns = list(cols)
+    out = out.sort_values(by=sort_by, kind='stable')
+    if out.index.is_monotonic_increasing:
+        # already in order: under copy-on-write sort_values hands back a lazy
+        # copy that may still share buffers with the caller's input frames
+        out = out.copy()
+    return out.reset_index(drop=True)
+
+@_copy_on_write
+def assemble_net_invoiced(inp, refs, price_ref, price_map=None):
+    inv = _invoice_lines(inp['invoice'])
+    inv.columns = list(_INV_COLS)
     inv['BAD RETURNS'] = 0; inv['GOOD RETURNS'] = 0
 
-    ret = inp['returns'][[
-        'Customer Return Date','Sold To Customer Number','Sold To Customer Name','Product Code','Product Description','Facility Name','Estimated Product Return Amount'
-    ]].copy()
+    ret = inp['returns'][list(_RET_SRC_COLS)]
     ret['Estimated Product Return Amount'] = ret['Estimated Product Return Amount'].fillna(0)
     ret['with_vat'] = ret['Estimated Product Return Amount'] * 1.12
-    cust_ret = ret.pivot_table(index=['Customer Return Date','Sold To Customer Number','Sold To Customer Name','Product Code','Product Description'], columns='Facility Name', values='with_vat', aggfunc='sum').reset_index()
+    cust_ret = (ret.groupby(list(_RET_SRC_COLS[:-1]))['with_vat'].sum()
+                   .unstack('Facility Name').reset_index())
     for c in ('BO','FG'):
         if c not in cust_ret.columns:
             cust_ret[c]=0
-    cust_ret = cust_ret.rename(columns={
-        'Customer Return Date':'DATE','Sold To Customer Number':'ACCOUNT CODE','Sold To Customer Name':'ACCOUNT NAME',
-        'Product Code':'SKU CODE','Product Description':'SKU NAME','BO':'BAD RETURNS','FG':'GOOD RETURNS'
-    })
+    cust_ret = cust_ret.rename(columns=_RET_RENAME)
     cust_ret['SERVED INVOICE']=0
-    net = pd.concat([inv, cust_ret], ignore_index=True, sort=False)
-
-    cust_df = inp['customer'][[
-        'NEXT_UP_NUMBER','PARTY_CLASSIFICATION_DESCRIPTION','KEY_ACCOUNT','SALES_REP_ID','SALES_REP_NAME','BRANCH_NAME','GEO_LOCATION_HIERARCHYDESCRIPTION','CITY','STATE_PROVINCE','CHANNEL'
-    ]].rename(columns={'NEXT_UP_NUMBER':'ACCOUNT CODE'})
-    net = net.merge(cust_df, on='ACCOUNT CODE', how='left')
-    net = net.merge(refs['category'].drop(columns=['SKU NAME'], errors='ignore'), on='SKU CODE', how='left')
-    net = net.merge(refs['field_supervisors'], on='SALES_REP_ID', how='left')
-    net = net.merge(refs['week'], on='DATE', how='inner')
-
-    # previous: fragile merge -> now map
-    price_map = _build_price_map(price_ref)
-    # map using SKU CODE column from net (converted to string)
-    net['SKU PRICE REFERENCE'] = net['SKU CODE'].astype(str).map(price_map).fillna(0)
-
-    # prefer SKU PRICE REFERENCE column
-    net['SKU PRICE REFERENCE'] = pd.to_numeric(net.get('SKU PRICE REFERENCE', 0), errors='coerce').fillna(0)
-    net['VALUE'] = net['SERVED INVOICE'].fillna(0) - net['BAD RETURNS'].fillna(0) - net['GOOD RETURNS'].fillna(0)
-    net['VOLUME'] = 0
-    mask = net['SKU PRICE REFERENCE'] != 0
-    net.loc[mask,'VOLUME'] = net.loc[mask,'VALUE'] / net.loc[mask,'SKU PRICE REFERENCE']
+    cols = list(inv.columns)
+    net = pd.concat([inv, cust_ret[cols]], ignore_index=True)
+
+    cust_df = inp['customer'][list(_CUSTOMER_COLS)].rename(columns={'NEXT_UP_NUMBER':'ACCOUNT CODE'})
+    net = _join_refs(net, cust_df, refs)
+
+    # price lookup: map SKU CODE (compared as string) through price_map
+    if price_map is None:
+        price_map = build_price_map(price_ref)
+    net = _attach_price(net, price_map)
+
+    # one fillna over all amount columns (SKU PRICE REFERENCE is already filled)
+    amounts = ['SERVED INVOICE','BAD RETURNS','GOOD RETURNS']
+    net[amounts] = net[amounts].fillna(0)
+    value = (net['SERVED INVOICE'].to_numpy(dtype=np.float64)
+             - net['BAD RETURNS'].to_numpy(dtype=np.float64)
+             - net['GOOD RETURNS'].to_numpy(dtype=np.float64))
+    net['VALUE'] = value
+    net['VOLUME'] = _volume(value, net['SKU PRICE REFERENCE'])
 
     net['RD Name'] = 'Kimberlin'
-    rename_map = {
-        'DATE':'Date','WEEK':'Week','BRANCH_NAME':'Branch Name','SALES_REP_ID':'Employee Code','SALES_REP_NAME':'Employee Name',
-        'KEY_ACCOUNT':'Channel','ACCOUNT CODE':'Sold To Customer number','ACCOUNT NAME':'Sold To Customer Name','CATEGORY':'Category',
-        'SKU CODE':'Product Code','SKU NAME':'Product Description','VOLUME':'Volume','VALUE':'Net Value','GOOD RETURNS':'Good Stock Returns',
-        'BAD RETURNS':'Bad Stock Returns','PARTY_CLASSIFICATION_DESCRIPTION':'Channel_Classification','GEO_LOCATION_HIERARCHYDESCRIPTION':'Brgy',
-        'CITY':'Town','STATE_PROVINCE':'Province','FS':'FS','CHANNEL':'RTM Model'
-    }
-    net.rename(columns=rename_map, inplace=True)
-    cols = ['RD Name','Date','Week','Branch Name','Employee Code','Employee Name','Channel','Sold To Customer number','Sold To Customer Name','Category',
-            'Product Code','Product Description','Volume','Net Value','Good Stock Returns','Bad Stock Returns','Channel_Classification','Brgy','Town','Province','FS','RTM Model']
-    return net[cols].sort_values(by=['Date','Sold To Customer number'])
-
-def assemble_served_invoice(inp, refs, price_ref):
-    inv = inp['invoice'][inp['invoice']['Invoice Item Type']!='ITM_SALES_TAX'][[
-        'Invoice Date','Sold To Customer Number','Sold To Customer Name','Product Code','Product/Item Description','Total Item amount with Tax and Discount'
-    ]].copy()
-    inv.columns = ['DATE','ACCOUNT CODE','ACCOUNT NAME','SKU CODE','SKU NAME','SERVED INVOICE']
+    return _finalize(net, _NET_PICK, _NET_COLS, ['Date','Sold To Customer number'])
+
+@_copy_on_write
+def assemble_served_invoice(inp, refs, price_ref, price_map=None):
+    inv = _invoice_lines(inp['invoice'])
+    inv.columns = list(_INV_COLS)
     inv['SERVED INVOICE'] = inv['SERVED INVOICE'].fillna(0)
 
-    cust_df = inp['customer'][['NEXT_UP_NUMBER','PARTY_CLASSIFICATION_DESCRIPTION','KEY_ACCOUNT','SALES_REP_ID','SALES_REP_NAME','BRANCH_NAME','GEO_LOCATION_HIERARCHYDESCRIPTION','CITY','STATE_PROVINCE','CHANNEL']].rename(columns={'NEXT_UP_NUMBER':'ACCOUNT CODE'})
-    df = (inv.merge(cust_df, on='ACCOUNT CODE', how='left')
-             .merge(refs['category'].drop(columns=['SKU NAME'],errors='ignore'), on='SKU CODE', how='left')
-             .merge(refs['field_supervisors'], on='SALES_REP_ID', how='left')
-             .merge(refs['week'], on='DATE', how='inner')
-         )
+    cust_df = inp['customer'][list(_CUSTOMER_COLS)].rename(columns={'NEXT_UP_NUMBER':'ACCOUNT CODE'})
+    df = _join_refs(inv, cust_df, refs)
 
-    price_map = _build_price_map(price_ref)
-    df['SKU PRICE REFERENCE'] = df['SKU CODE'].astype(str).map(price_map).fillna(0)
-    df['VOLUME'] = 0
-    mask = df['SKU PRICE REFERENCE'] != 0
-    df.loc[mask,'VOLUME'] = df.loc[mask,'SERVED INVOICE'] / df.loc[mask,'SKU PRICE REFERENCE']
+    if price_map is None:
+        price_map = build_price_map(price_ref)
+    df = _attach_price(df, price_map)
+    df['VOLUME'] = _volume(df['SERVED INVOICE'], df['SKU PRICE REFERENCE'])
     df['RD Name']='Kimberlin'
-    df.rename(columns={'DATE':'Invoice Date','WEEK':'Week','BRANCH_NAME':'Branch Name','SALES_REP_ID':'Employee Code','SALES_REP_NAME':'Employee Name','KEY_ACCOUNT':'Channel','ACCOUNT CODE':'Sold To Customer Number','ACCOUNT NAME':'Sold To Customer Name','CATEGORY':'Category','SKU CODE':'Product Code','SKU NAME':'Product Description','VOLUME':'Volume','SERVED INVOICE':'Value','PARTY_CLASSIFICATION_DESCRIPTION':'Channel Type'}, inplace=True)
-    cols = ['RD Name','Invoice Date','Week','Branch Name','Employee Code','Employee Name','Channel','Sold To Customer Number','Sold To Customer Name','Category','Product Code','Product Description','Volume','Value','FS','Channel Type']
-    return df[cols].sort_values(by=['Invoice Date','Sold To Customer Number'])
+    return _finalize(df, _SERVED_PICK, _SERVED_COLS, ['Invoice Date','Sold To Customer Number'])
 
+@_copy_on_write
 def assemble_sales_orders(inp, refs, price_ref):
     """Assemble sales orders report with volume calculations."""
     # 1. Extract and prepare sales orders
-    so = inp['sales_order'][[
-        'Last Modified Date',
-        'Sold To Customer number',
-        'Sold To Customer Name',
-        'Product Code',
-        'Product Description',
-        'Total Product Amount',
-        'SO status'
-    ]].copy()
+    so = inp['sales_order'][list(_SO_SRC_COLS)]
     
     # Filter and calculate VAT
     so = so[so['SO status'] == 'Invoiced']
@@ -266,63 +444,16 @@ def assemble_sales_orders(inp, refs, price_ref):
     so['with vat'] = so['Total Product Amount'] * 1.12
 
     # 2. Prepare customer data
-    cust = inp['customer'][[
-        'NEXT_UP_NUMBER',
-        'PARTY_CLASSIFICATION_DESCRIPTION',
-        'KEY_ACCOUNT',
-        'SALES_REP_ID',
-        'SALES_REP_NAME',
-        'BRANCH_NAME',
-        'GEO_LOCATION_HIERARCHYDESCRIPTION',
-        'CITY',
-        'STATE_PROVINCE',
-        'CHANNEL'
-    ]].rename(columns={'NEXT_UP_NUMBER': 'Sold To Customer number'})
+    cust = inp['customer'][list(_CUSTOMER_COLS)].rename(columns={'NEXT_UP_NUMBER': 'Sold To Customer number'})
 
     # 3. Build main dataframe through merges
-    df = (so.merge(cust, on='Sold To Customer number', how='left')
-            .merge(refs['category'].rename(columns={'SKU CODE': 'Product Code'}), 
-                  on='Product Code', how='left')
-            .merge(refs['field_supervisors'], on='SALES_REP_ID', how='left')
-            .merge(refs['week'].rename(columns={'DATE': 'Last Modified Date'}), 
-                  on='Last Modified Date', how='inner')
-         )
+    df = _join_refs(so, cust, refs, account='Sold To Customer number', sku='Product Code', date='Last Modified Date')
 
     # 4. Price reference and volume calculation
     pr = _ensure_price_ref(price_ref)
     df['SKU PRICE REFERENCE'] = pd.to_numeric(pr['SKU PRICE REFERENCE'], errors='coerce').fillna(0)
-    
-    # Initialize VOLUME as float64 to avoid dtype warning
-    df['VOLUME'] = pd.Series(0, index=df.index, dtype='float64')
-    mask = df['SKU PRICE REFERENCE'] != 0
-    if mask.any():
-        df.loc[mask, 'VOLUME'] = (
-            pd.to_numeric(df.loc[mask, 'with vat'], errors='coerce') / 
-            pd.to_numeric(df.loc[mask, 'SKU PRICE REFERENCE'], errors='coerce')
-        ).fillna(0)
-
-    # 5. Add RD name and standardize columns
+    df['VOLUME'] = _volume(df['with vat'], df['SKU PRICE REFERENCE'])
+
+    # 5. Add RD name, then select, label and order the final columns
     df['RD Name'] = 'Kimberlin'
-    df.rename(columns={
-        'Last Modified Date': 'SO Date',
-        'WEEK': 'Week',
-        'BRANCH_NAME': 'Branch Name',
-        'SALES_REP_ID': 'Employee Code',
-        'SALES_REP_NAME': 'Employee Name',
-        'KEY_ACCOUNT': 'Channel',
-        'Sold To Customer number': 'Sold To Customer Number',
-        'CATEGORY': 'Category',
-        'VOLUME': 'Volume',
-        'with vat': 'Value',
-        'PARTY_CLASSIFICATION_DESCRIPTION': 'Channel Type'
-    }, inplace=True)
-
-    # 6. Select and order final columns
-    cols = [
-        'RD Name', 'SO Date', 'Week', 'Branch Name', 'Employee Code',
-        'Employee Name', 'Channel', 'Sold To Customer Number',
-        'Sold To Customer Name', 'Category', 'Product Code',
-        'Product Description', 'Volume', 'Value', 'FS', 'Channel Type'
-    ]
-    
-    return df[cols].sort_values(by=['SO Date', 'Sold To Customer Number'])
\ No newline at end of file
+    return _finalize(df, _SO_PICK, _SO_COLS, ['SO Date', 'Sold To Customer Number'])